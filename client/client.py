@@ -38,4 +38,5 @@ def draft():
 
 if __name__ == '__main__':
     # Run client UI on port 5000 by default (so it's easy to open in the browser)
-    app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('CLIENT_PORT', 5000)))
\ No newline at end of file
+    # This is Werkzeug's dev server (debug only with FLASK_DEV=1); use client/wsgi.py with gunicorn in production.
+    app.run(debug=bool(os.environ.get('FLASK_DEV')), host='0.0.0.0', port=int(os.environ.get('CLIENT_PORT', 5000)))
\ No newline at end of file
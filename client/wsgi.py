@@ -0,0 +1,6 @@
+# client/wsgi.py (production entry point)
+#
+#   gunicorn --chdir client -w 4 wsgi:app
+#
+# The client app only renders templates and holds no state, so it can run several workers.
+from client import app  # noqa: F401
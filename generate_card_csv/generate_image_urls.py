@@ -1,44 +1,132 @@
 import requests
+import contextlib
 import csv
 import time
 import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def get_scryfall_image_url(card_name):
-    """Fetch the PNG image URL for a given Magic card from Scryfall."""
-    url = f"https://api.scryfall.com/cards/named?exact={card_name}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        print(f"Error fetching {card_name}: {response.status_code}")
-        return None
+COLLECTION_URL = "https://api.scryfall.com/cards/collection"
+BATCH_SIZE = 75  # max identifiers Scryfall accepts per collection request
+MAX_WORKERS = 8
+REQUEST_INTERVAL = 0.1  # be nice to Scryfall’s API (rate limit ~10 req/s)
+REQUEST_TIMEOUT = 30  # seconds; a stalled connection must not hang a worker forever
 
-    data = response.json()
+
+class RateLimiter:
+    """Space out calls to wait() by at least `interval` seconds across all threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_image_url(card):
+    """Return the PNG image URL from a Scryfall card object."""
     # Handle double-faced or special cards
-    if "image_uris" in data:
-        return data["image_uris"]["png"]
-    elif "card_faces" in data and "image_uris" in data["card_faces"][0]:
-        return data["card_faces"][0]["image_uris"]["png"]
-    else:
-        print(f"No image found for {card_name}")
-        return None
+    if "image_uris" in card:
+        return card["image_uris"]["png"]
+    elif "card_faces" in card and "image_uris" in card["card_faces"][0]:
+        return card["card_faces"][0]["image_uris"]["png"]
+    return None
+
+
+def get_scryfall_image_urls(session, card_names, limiter=None):
+    """Fetch PNG image URLs for up to BATCH_SIZE card names in one request.
+
+    Returns a dict keyed by lower-cased card name; missing cards are left out.
+    """
+    if limiter is not None:
+        limiter.wait()
+    print(f"Fetching {len(card_names)} cards: {card_names[0]} ...")
+    try:
+        response = session.post(COLLECTION_URL, json={"identifiers": [{"name": n} for n in card_names]},
+                                timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200:
+            print(f"Error fetching batch starting at {card_names[0]}: {response.status_code}")
+            return {}
+        data = response.json()
+    except requests.RequestException as e:
+        # keep the other batches (and the cache they feed); these cards are retried next run
+        print(f"Error fetching batch starting at {card_names[0]}: {e}")
+        return {}
+    for missing in data.get("not_found", []):
+        print(f"Card not found: {missing.get('name')}")
+
+    urls = {}
+    for card in data.get("data", []):
+        image_url = get_image_url(card)
+        # Double-faced cards come back as "Front // Back"; also index them by the front face
+        names = [card["name"]] + [face["name"] for face in card.get("card_faces", [])[:1]]
+        for name in names:
+            urls[name.lower()] = image_url
+    return urls
+
+
+def load_cached_urls(csv_path):
+    """Return {lower-cased name: image_url} for rows of a previous run that found an image."""
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as csvfile:
+            return {row["name"].lower(): row["image_url"] for row in csv.DictReader(csvfile) if row.get("image_url")}
+    except FileNotFoundError:
+        return {}
 
 
 def generate_card_links(input_file, output_file=os.path.join(os.path.dirname(__file__), 'cards.csv')):
-    """Read card names from a file and write card name + PNG link to CSV."""
+    """Read card names from a file and write card name + PNG link to CSV.
+
+    Names already resolved in an existing output_file are reused; only new cards hit Scryfall.
+    """
     with open(input_file, "r", encoding="utf-8") as f:
         card_names = [line.strip() for line in f if line.strip()]
 
+    urls = load_cached_urls(output_file)
+    # dict.fromkeys drops duplicate names while keeping input order
+    missing = list(dict.fromkeys(n for n in card_names if n.lower() not in urls))
+    cached = {n.lower() for n in card_names} & urls.keys()
+    print(f"{len(cached)} cards cached, fetching {len(missing)}")
+
+    batches = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+    limiter = RateLimiter(REQUEST_INTERVAL)
+    with requests.Session() as session:
+        session.headers.update({"Accept": "application/json"})
+        # overlap round trips; the limiter keeps request starts under Scryfall's rate limit
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for batch_urls in executor.map(lambda b: get_scryfall_image_urls(session, b, limiter), batches):
+                urls.update(batch_urls)
+
     results = []
     for name in card_names:
-        print(f"Fetching: {name}")
-        image_url = get_scryfall_image_url(name)
+        image_url = urls.get(name.lower())
+        if image_url is None:
+            print(f"No image found for {name}")
         results.append({"name": name, "image_url": image_url})
-        time.sleep(0.1)  # be nice to Scryfall’s API (rate limit ~10 req/s)
 
-    # Write results to CSV
-    with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=["name", "image_url"])
-        writer.writeheader()
-        writer.writerows(results)
+    # Write results to a sibling temp file and swap it in, so an interrupted run never loses the cache
+    tmp_path = output_file + ".tmp"
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=["name", "image_url"])
+            writer.writeheader()
+            writer.writerows(results)
+        if os.path.exists(output_file):
+            shutil.copymode(output_file, tmp_path)  # keep the existing file's permissions
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        # the temp file may not exist if opening it is what failed
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
 
     print(f"Done! Results written to {output_file}")
 
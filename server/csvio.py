@@ -0,0 +1,42 @@
+# server/csvio.py (card CSV parsing)
+#
+# Kept free of Flask imports and fully annotated so it can be compiled ahead of time with mypyc:
+#
+#   cd server && mypyc csvio.py
+#
+# The built extension (csvio.*.so, git-ignored) is then imported in place of this file;
+# without it the pure-Python module is used unchanged.
+import csv
+import logging
+from typing import List, NamedTuple
+
+log = logging.getLogger("server.csvio")
+
+
+class Card(NamedTuple):
+    """A card in a pack or deck. Converted to {'name', 'url'} dicts only when sent to clients."""
+    name: str
+    url: str
+
+
+def read_cards(file_path: str) -> List[Card]:
+    """Parse a CSV with 'name' and 'image_url' columns into Cards. Raises FileNotFoundError."""
+    with open(file_path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header: List[str] = next(reader, [])
+        try:
+            ni = header.index('name')
+            ui = header.index('image_url')
+        except ValueError:
+            log.warning("%s has no name/image_url columns; skipping", file_path)
+            return []
+        width = max(ni, ui) + 1
+        # positional rows: no per-row dict, and `if row` skips blank lines like DictReader did;
+        # short rows get '' for the missing fields
+        return [Card(row[ni].strip(), row[ui].strip()) if len(row) >= width
+                else Card(_field(row, ni), _field(row, ui))
+                for row in reader if row]
+
+
+def _field(row: List[str], i: int) -> str:
+    return row[i].strip() if i < len(row) else ''
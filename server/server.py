@@ -1,11 +1,23 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_socketio import SocketIO
 from flask_cors import CORS
 import os
 import logging
 import random
-import csv
 import copy
+import hashlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from csvio import Card, read_cards
+
+try:
+    # optional: faster encoder for the packs/deck payloads
+    import orjson
+except ImportError:
+    orjson = None
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -20,21 +32,43 @@ TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
 
 app = Flask(__name__, template_folder=TEMPLATES_DIR, static_folder=os.path.join(REPO_ROOT, 'static'))
 
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson; installed on the app when orjson is available."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
 # enable CORS for HTTP endpoints (client UI runs on different origin)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
-# Socket.IO with CORS allowed for sockets
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Socket.IO with CORS allowed for sockets. With orjson, packets are encoded by the provider instance
+# directly: broadcasts are sent from a background task with no app context, where flask.json
+# would silently fall back to the stdlib encoder.
+socketio_options = {'json': app.json} if orjson is not None else {}
+socketio = SocketIO(app, cors_allowed_origins="*", **socketio_options)
 
 # Game configuration
 PACK_SIZE = 14
 DEFAULT_PLAYERS = 5
 DEFAULT_ROUNDS = 3  # total rounds in a draft
+NUMPY_SAMPLE_MIN_POOL = 10000  # below this, random.sample beats numpy's call overhead
 
 # Global server-side game state
 all_cards = []                # fallback card pool (loaded from CSV)
-packs_rounds = []             # packs_rounds[round_index][pack_index] -> list of card dicts
+_all_cards_mtime = None       # st_mtime_ns of cards.csv when all_cards was loaded (None: no file)
+packs_rounds = []             # packs_rounds[round_index][pack_index] -> list of Card
 packs_ready_rounds = []       # parallel boolean arrays
+packs_index_rounds = []       # parallel dicts: card name -> positions of that card in the pack
+round_cards_left = []         # round_cards_left[round_index] -> cards not yet picked in that round
+packs_counts_rounds = []      # parallel card counts per pack, updated in place on each pick
 current_round = 0
 TOTAL_ROUNDS = DEFAULT_ROUNDS
 
@@ -53,27 +87,127 @@ sid_to_name = {}
 # Remember number of players used when last refresh() ran — helpful for diagnostics
 players_count = None
 
+# Guards the draft state above and the /get_packs cache below; routes run concurrently under gunicorn threads
+_draft_lock = threading.RLock()
+
+# Encoded /get_packs body and its ETag; rebuilt lazily after any round state change
+_packs_body = None
+_packs_etag = None
+
+# Pending socket emits as (event, data, to_sid), sent by a background task so routes don't wait
+# on socket I/O. The queue comes from engineio so it cooperates with threading, eventlet or gevent.
+_notify_queue = socketio.server.eio.create_queue()
+# Payload of the queued 'packs_update' (None when none is queued). It is sent with the snapshot
+# current at send time, so later broadcasts update it instead of queueing another emit; per-pick
+# events never overwrite a pending lifecycle event like 'round_advanced' or 'draft_complete'.
+_pending_payload = None
+_ROUTINE_EVENTS = ('pick_made', 'pack_claimed')
+
 BASE_DIR = REPO_ROOT  # used for loading sets/cards files
 
 
 # -----------------------
 # Helpers
 # -----------------------
-def load_cards_from_csv_path(file_path):
-    cards = []
+def _dumps_bytes(obj):
+    """Encode obj as a UTF-8 JSON body, skipping the str round trip when orjson is available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return app.json.dumps(obj).encode('utf-8')
+
+
+def _cards_json(cards):
+    return [c._asdict() for c in cards]
+
+
+def _packs_json(packs):
+    return [_cards_json(p) for p in packs]
+
+
+# Parsed CSVs and folder listings keyed by path -> (mtime_ns, data). The card files are
+# effectively immutable on disk, so refreshes only pay for a stat() in the steady state.
+_CSV_CACHE = {}
+_FOLDER_CACHE = {}
+_SET_INDEX_CACHE = {}
+
+# Pack CSVs for a round are parsed in parallel; file reads release the GIL
+_pack_loader = ThreadPoolExecutor(max_workers=8, thread_name_prefix='pack-loader')
+
+
+# Optional pyarrow modules (pa, pc, pacsv), imported on the first fast=True parse since they
+# cost ~15 MB RSS; False once the import has failed.
+_pyarrow_modules = None
+
+
+def _load_pyarrow():
+    """Return (pyarrow, pyarrow.compute, pyarrow.csv), or None when pyarrow isn't installed."""
+    global _pyarrow_modules
+    if _pyarrow_modules is None:
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.csv as pacsv
+            _pyarrow_modules = (pa, pc, pacsv)
+        except ImportError:
+            _pyarrow_modules = False
+    return _pyarrow_modules or None
+
+
+def _read_cards_arrow(file_path, pyarrow_modules):
+    pa, pc, pacsv = pyarrow_modules
+    table = pacsv.read_csv(file_path, convert_options=pacsv.ConvertOptions(
+        include_columns=['name', 'image_url'],
+        column_types={'name': pa.string(), 'image_url': pa.string()}))
+    names = pc.utf8_trim_whitespace(table.column('name')).to_pylist()
+    urls = pc.utf8_trim_whitespace(table.column('image_url')).to_pylist()
+    return [Card(n or '', u or '') for n, u in zip(names, urls)]
+
+
+def load_cards_from_csv_path(file_path, fast=False):
+    """
+    Load Card rows from a CSV with 'name' and 'image_url' columns (cached by mtime).
+    fast=True parses with pyarrow when it is installed; only worth it for large files like the card pool.
+    """
     try:
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                cards.append({'name': row.get('name', '').strip(), 'url': row.get('image_url', '').strip()})
+        mtime = os.stat(file_path).st_mtime_ns
     except FileNotFoundError:
         return []
-    return cards
+    cached = _CSV_CACHE.get(file_path)
+    if cached and cached[0] == mtime:
+        # hand out a fresh list so callers can pop/shuffle without touching the cache
+        return list(cached[1])
+
+    try:
+        pyarrow_modules = _load_pyarrow() if fast else None
+        if pyarrow_modules is not None:
+            try:
+                cards = _read_cards_arrow(file_path, pyarrow_modules)
+            except pyarrow_modules[0].ArrowException:
+                # empty file, ragged rows or missing columns: let the stdlib parser decide, as without pyarrow
+                cards = read_cards(file_path)
+        else:
+            cards = read_cards(file_path)
+    except FileNotFoundError:
+        return []
+    _CSV_CACHE[file_path] = (mtime, cards)
+    return list(cards)
 
 
 def load_cards_from_csv(filename='cards.csv'):
     file_path = os.path.join(BASE_DIR, filename)
-    return load_cards_from_csv_path(file_path)
+    return load_cards_from_csv_path(file_path, fast=True)
+
+
+def _reload_all_cards_if_changed(filename='cards.csv'):
+    """Reload the fallback pool only when the CSV's mtime differs from the one it was loaded at."""
+    global all_cards, _all_cards_mtime
+    try:
+        mtime = os.stat(os.path.join(BASE_DIR, filename)).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime != _all_cards_mtime:
+        all_cards = load_cards_from_csv(filename)
+        _all_cards_mtime = mtime
 
 
 def _deepcopy_rounds(rounds_list):
@@ -81,29 +215,84 @@ def _deepcopy_rounds(rounds_list):
     return [ [ copy.deepcopy(pack) for pack in round_packs ] for round_packs in rounds_list ]
 
 
-def list_set_folders():
-    sets_dir = os.path.join(BASE_DIR, 'sets')
+def _list_subfolders(dir_path):
+    """Return the sorted sub-directory names of dir_path, cached until the directory changes."""
+    try:
+        mtime = os.stat(dir_path).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    cached = _FOLDER_CACHE.get(dir_path)
+    if cached and cached[0] == mtime:
+        return list(cached[1])
+
     try:
-        entries = os.listdir(sets_dir)
+        # scandir's is_dir() uses the dirent type, so there is no extra stat() per entry
+        with os.scandir(dir_path) as it:
+            folders = sorted(e.name for e in it if e.is_dir())
     except FileNotFoundError:
         return []
-    folders = [e for e in entries if os.path.isdir(os.path.join(sets_dir, e))]
-    return sorted(folders)
+    _FOLDER_CACHE[dir_path] = (mtime, folders)
+    return list(folders)
 
 
-def list_pack_folders(set_name):
+def list_set_folders():
+    sets_dir = os.path.join(BASE_DIR, 'sets')
+    return _list_subfolders(sets_dir)
+
+
+def index_set(set_name):
+    """
+    Return {pack_folder: path to its cards.csv} for a set, sorted by folder name.
+    Cached until the set directory changes; callers must not mutate the returned dict.
+    """
     set_dir = os.path.join(BASE_DIR, 'sets', set_name)
     try:
-        entries = os.listdir(set_dir)
+        mtime = os.stat(set_dir).st_mtime_ns
     except FileNotFoundError:
-        return []
-    folders = [e for e in entries if os.path.isdir(os.path.join(set_dir, e))]
-    return sorted(folders)
+        return {}
+    cached = _SET_INDEX_CACHE.get(set_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    index = {pf: os.path.join(set_dir, pf, 'cards.csv') for pf in _list_subfolders(set_dir)}
+    _SET_INDEX_CACHE[set_dir] = (mtime, index)
+    return index
+
+
+def list_pack_folders(set_name):
+    return list(index_set(set_name))
+
+
+def _pack_csv_path(index, set_name, pack_folder):
+    if pack_folder in index:
+        return index[pack_folder]
+    return os.path.join(BASE_DIR, 'sets', set_name, pack_folder, 'cards.csv')
 
 
-def load_pack_cards(set_name, pack_folder):
-    pack_csv_path = os.path.join(BASE_DIR, 'sets', set_name, pack_folder, 'cards.csv')
-    return load_cards_from_csv_path(pack_csv_path)
+def _with_draft_lock(fn):
+    """Run a route's read-modify-write of the draft state under _draft_lock."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _draft_lock:
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _index_pack(pack):
+    """Map each card name to its positions in pack (a name can appear more than once)."""
+    index = {}
+    for i, c in enumerate(pack):
+        index.setdefault(c.name, []).append(i)
+    return index
+
+
+def _append_round(round_packs, num_players):
+    """Append a freshly generated round to packs_rounds and its parallel ready/index arrays."""
+    packs_rounds.append(round_packs)
+    packs_ready_rounds.append([False] * num_players)
+    packs_index_rounds.append([_index_pack(p) for p in round_packs])
+    round_cards_left.append(sum(len(p) for p in round_packs))
+    packs_counts_rounds.append([len(p) for p in round_packs])
 
 
 def _current_round_snapshot():
@@ -114,12 +303,13 @@ def _current_round_snapshot():
         counts = []
     else:
         packs = packs_rounds[current_round]
-        ready = packs_ready_rounds[current_round]
-        counts = [len(p) for p in packs]
+        # copies: the snapshot is encoded after _draft_lock is released
+        ready = list(packs_ready_rounds[current_round])
+        counts = list(packs_counts_rounds[current_round])
     return {
         'current_round': current_round,
         'rounds': TOTAL_ROUNDS,
-        'packs': packs,
+        'packs': _packs_json(packs),
         'packs_ready': ready,
         'packs_counts': counts,
         'players': players_count if players_count is not None else len(connected_sids)
@@ -128,15 +318,74 @@ def _current_round_snapshot():
 
 def notify_clients(payload):
     """
-    Emit a 'packs_update' event to all connected socket clients.
-    The payload will be augmented with the authoritative current-round snapshot.
+    Queue a 'packs_update' event for all connected socket clients and return immediately.
+    The payload will be augmented with the authoritative current-round snapshot when it is sent.
+    Every round state change is broadcast through here, so this also drops the cached /get_packs body.
     """
-    try:
-        snapshot = _current_round_snapshot()
-        merged = {**snapshot, **payload}
-        socketio.emit('packs_update', merged)
-    except Exception as e:
-        log.exception("Failed to emit packs_update: %s", e)
+    global _packs_body, _pending_payload
+    with _draft_lock:
+        _packs_body = None
+        if _pending_payload is None:
+            _pending_payload = payload
+            _notify_queue.put(('packs_update', None, None))
+        elif payload.get('event') not in _ROUTINE_EVENTS or _pending_payload.get('event') in _ROUTINE_EVENTS:
+            _pending_payload = payload
+
+
+def emit_to_client(event, data, sid):
+    """Queue a socket event for a single client and return immediately."""
+    _notify_queue.put((event, data, sid))
+
+
+def _drain_notifications():
+    """Background task: send queued events; 'packs_update' is merged with the snapshot current at send time."""
+    global _pending_payload
+    while True:
+        event, data, sid = _notify_queue.get()
+        try:
+            if event == 'packs_update':
+                with _draft_lock:
+                    data, _pending_payload = _pending_payload, None
+                    snapshot = _current_round_snapshot()
+                socketio.emit(event, {**snapshot, **data})
+            else:
+                socketio.emit(event, data, to=sid)
+        except Exception as e:
+            log.exception("Failed to emit %s (sid=%s): %s", event, sid, e)
+
+
+# Optional numpy Generator, created the first time a pool reaches NUMPY_SAMPLE_MIN_POOL
+# (numpy costs ~35 MB RSS); False once the import has failed.
+_np_rng = None
+
+
+def _load_np_rng():
+    """Return a numpy random Generator, or None when numpy isn't installed."""
+    global _np_rng
+    if _np_rng is None:
+        try:
+            import numpy as np
+            _np_rng = np.random.default_rng()
+        except ImportError:
+            _np_rng = False
+    return _np_rng or None
+
+
+def _sample_cards(pool, count):
+    """Return count distinct cards from pool in random order (count <= len(pool))."""
+    rng = _load_np_rng() if len(pool) >= NUMPY_SAMPLE_MIN_POOL else None
+    if rng is not None:
+        # draw integer positions in C and only touch the Card objects that were picked
+        positions = rng.choice(len(pool), size=count, replace=False)
+        return [pool[i] for i in positions.tolist()]
+    return random.sample(pool, count)
+
+
+def _shuffled_cycle(items, count):
+    """Return count items from a shuffled copy of items, wrapping around if count > len(items)."""
+    shuffled = random.sample(items, len(items))
+    n = len(shuffled)
+    return [shuffled[i % n] for i in range(count)]
 
 
 def generate_round_packs(num_players, round_index, set_name=None):
@@ -151,28 +400,30 @@ def generate_round_packs(num_players, round_index, set_name=None):
         # Use the chosen list's slice for this round
         start = round_index * num_players
         group = chosen_pack_folders[start:start + num_players]
-        for pf in group:
-            cards = load_pack_cards(set_name, pf)
-            packs.append(list(cards))
+        index = index_set(set_name)
+        paths = [_pack_csv_path(index, set_name, pf) for pf in group]
+        packs.extend(_pack_loader.map(load_cards_from_csv_path, paths))
     else:
-        # fallback: generate packs from all_cards shuffled per-round (allow cycling)
-        shuffled = all_cards.copy()
-        random.shuffle(shuffled)
+        # fallback: draw only the cards this round needs from all_cards (allow repeats)
+        _reload_all_cards_if_changed()
+        needed = PACK_SIZE * num_players
+        if not all_cards:
+            chosen = []
+        elif needed <= len(all_cards):
+            chosen = _sample_cards(all_cards, needed)
+        else:
+            # cycle if not enough cards
+            chosen = _shuffled_cycle(all_cards, needed)
         for p in range(num_players):
-            pack = shuffled[:PACK_SIZE]
-            if len(shuffled) >= PACK_SIZE:
-                shuffled = shuffled[PACK_SIZE:]
-            else:
-                # cycle if not enough cards
-                shuffled = shuffled + pack
-            packs.append(list(pack))
+            packs.append(chosen[p * PACK_SIZE:(p + 1) * PACK_SIZE])
     return packs
 
 
 # -----------------------
 # Initialization
 # -----------------------
-all_cards = load_cards_from_csv()
+_reload_all_cards_if_changed()
+socketio.start_background_task(_drain_notifications)
 
 
 # -----------------------
@@ -194,6 +445,7 @@ def forward_sets():
 
 
 @app.route('/go', methods=['POST'])
+@_with_draft_lock
 def host_go():
     """
     Host starts the draft. Body: { set: <name> (optional), rounds: <int> (optional) }.
@@ -201,7 +453,7 @@ def host_go():
     This implementation will create only the first round initially; subsequent rounds will be generated
     when the server advances.
     """
-    global current_round, TOTAL_ROUNDS, chosen_pack_folders, chosen_set_name, players_count, packs_rounds, packs_ready_rounds
+    global current_round, TOTAL_ROUNDS, chosen_pack_folders, chosen_set_name, players_count, packs_rounds, packs_ready_rounds, packs_index_rounds, round_cards_left, packs_counts_rounds
     data = request.get_json() or {}
     set_name = data.get('set')
     rounds = data.get('rounds') or DEFAULT_ROUNDS
@@ -219,21 +471,15 @@ def host_go():
     if set_name:
         available_pack_folders = list_pack_folders(set_name)
         if available_pack_folders:
-            chosen = []
-            shuffled = available_pack_folders.copy()
-            random.shuffle(shuffled)
-            i = 0
-            total_needed = players * TOTAL_ROUNDS
-            while len(chosen) < total_needed:
-                chosen.append(shuffled[i % len(shuffled)])
-                i += 1
-            chosen_pack_folders = chosen
+            chosen_pack_folders = _shuffled_cycle(available_pack_folders, players * TOTAL_ROUNDS)
 
     # reset state: create only round 0 packs now
     packs_rounds = []
     packs_ready_rounds = []
-    packs_rounds.append(generate_round_packs(players, 0, set_name=chosen_set_name))
-    packs_ready_rounds.append([False] * players)
+    packs_index_rounds = []
+    round_cards_left = []
+    packs_counts_rounds = []
+    _append_round(generate_round_packs(players, 0, set_name=chosen_set_name), players)
     # reset per-player decks
     for k in list(decks_by_name.keys()):
         decks_by_name[k] = []
@@ -244,11 +490,8 @@ def host_go():
     for i, sid in enumerate(list(connected_sids)):
         assigned_index = i % players
         name = sid_to_name.get(sid, '')
-        try:
-            socketio.emit('go', {'pack_index': assigned_index, 'name': name, 'players': players, 'rounds': TOTAL_ROUNDS}, to=sid)
-            notified += 1
-        except Exception:
-            log.exception("Failed to emit 'go' to sid=%s", sid)
+        emit_to_client('go', {'pack_index': assigned_index, 'name': name, 'players': players, 'rounds': TOTAL_ROUNDS}, sid)
+        notified += 1
 
     log.info("host_go: created initial round packs (rounds=%s players=%s)", TOTAL_ROUNDS, players)
     log.info("packs_rounds sizes per round (so far): %s", [[len(p) for p in r] for r in packs_rounds])
@@ -258,22 +501,33 @@ def host_go():
 
 
 @app.route('/get_packs')
+@_with_draft_lock
 def get_packs():
     """
     Return packs for the current round plus readiness info and counts.
+    The encoded body is cached between state changes and served with an ETag so pollers can get a 304.
     """
-    global current_round
-    packs = packs_rounds[current_round] if packs_rounds and current_round < len(packs_rounds) else []
-    ready = packs_ready_rounds[current_round] if packs_ready_rounds and current_round < len(packs_ready_rounds) else []
-    log.debug("get_packs: current_round=%s packs_count=%s packs_ready=%s players_count=%s",
-              current_round, len(packs), len(ready) if ready is not None else None, players_count)
-    return jsonify({
-        'packs': packs,
-        'current_round': current_round,
-        'rounds': TOTAL_ROUNDS,
-        'packs_ready': ready,
-        'packs_counts': [len(p) for p in packs]
-    })
+    global current_round, _packs_body, _packs_etag
+    body, etag = _packs_body, _packs_etag
+    if body is None:
+        packs = packs_rounds[current_round] if packs_rounds and current_round < len(packs_rounds) else []
+        ready = packs_ready_rounds[current_round] if packs_ready_rounds and current_round < len(packs_ready_rounds) else []
+        counts = packs_counts_rounds[current_round] if packs_counts_rounds and current_round < len(packs_counts_rounds) else []
+        log.debug("get_packs: current_round=%s packs_count=%s packs_ready=%s players_count=%s",
+                  current_round, len(packs), len(ready) if ready is not None else None, players_count)
+        body = _dumps_bytes({
+            'packs': _packs_json(packs),
+            'current_round': current_round,
+            'rounds': TOTAL_ROUNDS,
+            'packs_ready': ready,
+            'packs_counts': counts
+        })
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        _packs_body, _packs_etag = body, etag
+
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 @app.route('/get_sets')
@@ -287,6 +541,7 @@ def get_sets():
 
 
 @app.route('/get_deck')
+@_with_draft_lock
 def get_deck():
     """
     Return the deck for a player name (used by client on startup/reconnect).
@@ -296,17 +551,18 @@ def get_deck():
     if not name:
         return jsonify({'deck': []})
     deck = decks_by_name.get(name, [])
-    return jsonify({'deck': deck})
+    return jsonify({'deck': _cards_json(deck)})
 
 
 @app.route('/click', methods=['POST'])
+@_with_draft_lock
 def click():
     """
     User picks a card from a specified pack index (per-client mode).
     Accepts optional 'round' in request to avoid race if server advanced.
     Body: { player: <playerName>, card: <cardName>, pack_index: <int>, round: <int> (optional) }
     """
-    global current_round, packs_rounds, packs_ready_rounds
+    global current_round, packs_rounds, packs_ready_rounds, packs_index_rounds, round_cards_left, packs_counts_rounds
 
     data = request.get_json() or {}
     player_name = data.get('player') or data.get('name')
@@ -336,13 +592,25 @@ def click():
         return jsonify({'error': 'Invalid pack index'}), 400
 
     current_pack = round_packs[pack_index]
-    card_index = next((i for i, c in enumerate(current_pack) if c['name'] == card_name), None)
-    if card_index is None:
+    pack_names = packs_index_rounds[target_round][pack_index]
+    positions = pack_names.get(card_name)
+    if not positions:
         log.warning("click: card not found. payload=%s target_round=%s pack_index=%s pack_size=%s", data, target_round, pack_index, len(current_pack))
         return jsonify({'error': 'Card not found in specified pack'}), 404
 
-    # perform pick
-    card = current_pack.pop(card_index)
+    # perform pick: move the pack's last card into the picked slot so removal is O(1)
+    # (card order within a pack is only cosmetic) and repoint that card's index entry
+    card_index = positions.pop()
+    if not positions:
+        del pack_names[card_name]
+    card = current_pack[card_index]
+    last_card = current_pack.pop()
+    if card_index < len(current_pack):
+        current_pack[card_index] = last_card
+        moved_positions = pack_names[last_card.name]
+        moved_positions[moved_positions.index(len(current_pack))] = card_index
+    round_cards_left[target_round] -= 1
+    packs_counts_rounds[target_round][pack_index] -= 1
     decks_by_name.setdefault(player_name, []).append(card)
 
     # mark this pack ready for passing
@@ -352,16 +620,14 @@ def click():
     round_advanced = False
     if target_round == current_round:
         # If all packs in the authoritative round are empty, advance
-        all_empty = all(len(p) == 0 for p in round_packs)
-        if all_empty:
+        if round_cards_left[current_round] == 0:
             # If we haven't created the next round yet, generate it now (until TOTAL_ROUNDS)
             next_round_index = current_round + 1
             if next_round_index < TOTAL_ROUNDS:
                 # generate next round packs (append to packs_rounds/packs_ready_rounds)
                 num_players = players_count if players_count is not None else len(connected_sids)
                 next_round_packs = generate_round_packs(num_players, next_round_index, set_name=chosen_set_name)
-                packs_rounds.append(next_round_packs)
-                packs_ready_rounds.append([False] * num_players)
+                _append_round(next_round_packs, num_players)
                 # Now advance authoritative current_round
                 current_round = next_round_index
                 round_advanced = True
@@ -395,7 +661,7 @@ def click():
             'next_pack_index': next_index,
             'round_advanced': round_advanced,
             'current_round': current_round,
-            'deck': player_deck
+            'deck': _cards_json(player_deck)
         })
     else:
         return jsonify({
@@ -403,11 +669,12 @@ def click():
             'waiting_on': next_index,
             'round_advanced': round_advanced,
             'current_round': current_round,
-            'deck': player_deck
+            'deck': _cards_json(player_deck)
         })
 
 
 @app.route('/claim_pack', methods=['POST'])
+@_with_draft_lock
 def claim_pack():
     """
     Atomically claim a ready pack in the specified round (optional).
@@ -441,11 +708,12 @@ def claim_pack():
     notify_clients({'event': 'pack_claimed'})
 
     player_deck = decks_by_name.get(name, [])
-    return jsonify({'ok': True, 'pack_index': pack_index, 'pack': packs_rounds[target_round][pack_index],
-                    'packs_ready': packs_ready_rounds[target_round], 'deck': player_deck})
+    return jsonify({'ok': True, 'pack_index': pack_index, 'pack': _cards_json(packs_rounds[target_round][pack_index]),
+                    'packs_ready': packs_ready_rounds[target_round], 'deck': _cards_json(player_deck)})
 
 
 @app.route('/refresh', methods=['POST'])
+@_with_draft_lock
 def refresh():
     """
     External refresh endpoint (can be called by host OR any admin tooling).
@@ -460,7 +728,7 @@ def refresh():
     # Use same behavior as host_go but return packs for client convenience
     # Reuse host_go logic by delegating to do the same steps
     # Simplified: call host_go-like logic inline
-    global current_round, TOTAL_ROUNDS, chosen_pack_folders, chosen_set_name, players_count, packs_rounds, packs_ready_rounds
+    global current_round, TOTAL_ROUNDS, chosen_pack_folders, chosen_set_name, players_count, packs_rounds, packs_ready_rounds, packs_index_rounds, round_cards_left, packs_counts_rounds
     TOTAL_ROUNDS = rounds
     players_count = players if players and isinstance(players, int) and players > 0 else DEFAULT_PLAYERS
     chosen_set_name = set_name
@@ -469,21 +737,15 @@ def refresh():
     if chosen_set_name:
         available_pack_folders = list_pack_folders(chosen_set_name)
         if available_pack_folders:
-            chosen = []
-            shuffled = available_pack_folders.copy()
-            random.shuffle(shuffled)
-            i = 0
-            total_needed = players_count * TOTAL_ROUNDS
-            while len(chosen) < total_needed:
-                chosen.append(shuffled[i % len(shuffled)])
-                i += 1
-            chosen_pack_folders = chosen
+            chosen_pack_folders = _shuffled_cycle(available_pack_folders, players_count * TOTAL_ROUNDS)
 
     # reset and create first round
     packs_rounds = []
     packs_ready_rounds = []
-    packs_rounds.append(generate_round_packs(players_count, 0, set_name=chosen_set_name))
-    packs_ready_rounds.append([False] * players_count)
+    packs_index_rounds = []
+    round_cards_left = []
+    packs_counts_rounds = []
+    _append_round(generate_round_packs(players_count, 0, set_name=chosen_set_name), players_count)
 
     # reset per-player decks
     for k in list(decks_by_name.keys()):
@@ -494,7 +756,7 @@ def refresh():
     current_packs = packs_rounds[current_round] if packs_rounds else []
     current_ready = packs_ready_rounds[current_round] if packs_ready_rounds else []
     return jsonify({
-        'packs': current_packs,
+        'packs': _packs_json(current_packs),
         'deck': [],  # generic response (clients request their own deck via /get_deck)
         'current_round': current_round,
         'rounds': TOTAL_ROUNDS,
@@ -527,11 +789,12 @@ def on_connect():
             pass
         return
 
-    # initialize deck for name if missing (keeps deck across reconnects)
-    decks_by_name.setdefault(name, [])
+    with _draft_lock:
+        # initialize deck for name if missing (keeps deck across reconnects)
+        decks_by_name.setdefault(name, [])
 
-    sid_to_name[sid] = name
-    connected_sids.append(sid)
+        sid_to_name[sid] = name
+        connected_sids.append(sid)
     socketio.emit('user_count', len(connected_sids))
     log.info("Client registered: sid=%s name=%s count=%s", sid, name, len(connected_sids))
 
@@ -544,14 +807,16 @@ def on_disconnect():
     if src == 'admin':
         return
 
-    if sid in connected_sids:
-        connected_sids.remove(sid)
-    if sid in sid_to_name:
-        del sid_to_name[sid]
+    with _draft_lock:
+        if sid in connected_sids:
+            connected_sids.remove(sid)
+        if sid in sid_to_name:
+            del sid_to_name[sid]
     socketio.emit('user_count', len(connected_sids))
     log.info("Client removed: sid=%s count=%s", sid, len(connected_sids))
 
 
 if __name__ == '__main__':
+    # Development entry point; see server/wsgi.py for running under gunicorn.
     log.info("Starting server on port %s (templates=%s)", HOST_PORT, TEMPLATES_DIR)
     socketio.run(app, host='0.0.0.0', port=HOST_PORT)
\ No newline at end of file
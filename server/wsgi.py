@@ -0,0 +1,8 @@
+# server/wsgi.py (production entry point)
+#
+#   gunicorn --chdir server -w 1 --threads 100 wsgi:app
+#
+# Keep a single worker: draft state lives in process globals and Socket.IO needs every
+# client connected to the same process. Threads (or `-k gevent`) let concurrent picks and
+# polls from many drafters be served in parallel instead of one at a time.
+from server import app, socketio  # noqa: F401